@@ -1,10 +1,13 @@
 #! python
-# combine_nfl_dfs.py - combines pro-football_ref scraper data (def and off) with csv_data from draftkings (3 dataframes to 1)
-from scrape_fb_ref_def import defense
-from scrape_fb_ref_off import stats
+# combine_nfl_dfs.py - combines pro-football_ref scraper data (off) with csv_data from draftkings (2 dataframes to 1),
+# defenses come straight from draftkings' DST rows
+from scrape_fb_ref_off import get_stats
+from name_cleaner import clean_names
+import functools
 import os
 import sys
-import random
+import numexpr as ne
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -15,92 +18,128 @@ load_dotenv()
 # you need to add the draftking csv to the csv_files folder
 dk_csv_file = os.getenv("csv")
 dk_csv_path = f'./csv_files/{dk_csv_file}'
-data = pd.read_csv(dk_csv_path)
-
-# csv data as pandas df
-dk = pd.DataFrame(data)
-
-# replacing unwanted chars found in player names
-dk['Name'] = dk['Name'].str.replace(" II", "")
-dk['Name'] = dk['Name'].str.replace(" V ", "")
-dk['Name'] = dk['Name'].str.replace(" Jr.", "")
-dk['Name'] = dk['Name'].str.replace("\'", "")
-dk['Name'] = dk['Name'].str.replace(".", "")
-
-
-#  getting rid of players from draftking dk
-dk_def = dk[dk['Position'] == 'DST']
-
-#  getting rid of defense from draft kings df
-dk_players = dk[dk['Position'] != 'DST']
-
-# combining draftkings and stats dfs
-combo_raw = pd.merge_ordered(stats, dk_players, on='Name')
-
-# getting rid of players who aren't playing
-combo_raw = combo_raw[combo_raw.Salary.notnull()]
-
-# renaming merged dataframe
-combo = combo_raw
-
-# finding positions
-qb_raw = combo[combo['FantPos'] == 'QB']
-wr_raw = combo[combo['FantPos'] == 'WR']
-rb_raw = combo[combo['FantPos'] == 'RB']
-te_raw = combo[combo['FantPos'] == 'TE']
-flex_raw = combo[(combo['FantPos'] == 'RB') | (
-    combo['FantPos'] == 'WR') | (combo['FantPos'] == 'TE')]
-
-# finding wr by targets
-wr_targets = wr_raw.Tgt.quantile(q=.75)
-
-wr = wr_raw[(wr_raw['Tgt'] >= wr_targets) & (combo['VBD'] > 2)]
-
-# finding rb by rushing attempts
-rb_attempts = rb_raw.Att.quantile(q=.75)
-
-rb = rb_raw[(rb_raw['Att'] >= rb_attempts) & (rb_raw['VBD'] > 1.5)]
-
-# finding qb by Pass_cmp/Pass_Att and Pass_Yds/Pass_Att
-cmp_per = qb_raw['Pass_Cmp']/qb_raw['Pass_Att']
-pypa = qb_raw['Pass_Yds']/qb_raw['Pass_Att']  # pypa = pass yards per attempt
-qb = qb_raw[(cmp_per > .6) & (pypa > 5) & (
-    qb_raw['VBD'] > 2)]  # bitwise AND
-
-# finding te by targets
-te_targets = wr_raw.Tgt.quantile(q=.75)
-
-te = te_raw[(te_raw['Tgt'] >= te_targets) & (te_raw['VBD'] > 2)]
-
-# finding flex by combination
-flex_targets = flex_raw.Tgt.quantile(q=.75)
-flex_attempts = flex_raw.Att.quantile(q=.75)
-flex = flex_raw[((flex_raw['Tgt'] >= flex_targets) | (
-    flex_raw['Att'] >= flex_attempts)) & (flex_raw['VBD'] > 2)]
-
-# finding defense by average fantasy points
-d_arg = dk_def.AvgPointsPerGame.quantile(q=.25)
-defense = dk_def[dk_def['AvgPointsPerGame'] >= d_arg]
-
-# getting team ranges
-qbrng = random.randint(0, len(qb)-1)
-rbrng = random.randint(0, len(rb)-1)
-rbrng2 = random.randint(0, len(rb)-1)
-wrrng = random.randint(0, len(wr)-1)
-wrrng2 = random.randint(0, len(wr)-1)
-wrrng3 = random.randint(0, len(wr)-1)
-terng = random.randint(0, len(te)-1)
-flexrng = random.randint(0, len(flex)-1)
-defenserng = random.randint(0, len(defense)-1)
-
-# shuffling repeat positions to avoid duplicates, using pd.sample
-rb1 = rb.sample(frac=1)
-rb2 = rb.sample(frac=1)
-wr1 = wr.sample(frac=1)
-wr2 = wr.sample(frac=1)
-wr3 = wr.sample(frac=1)
-
-# making the team
-team_raw = [qb.iloc[qbrng], rb1.iloc[rbrng], rb2.iloc[rbrng2], wr1.iloc[wrrng], wr2.iloc[wrrng2],
-            wr3.iloc[wrrng3], te.iloc[terng], flex.iloc[flexrng], defense.iloc[defenserng]]
-team = pd.DataFrame.from_records([x.to_dict() for x in team_raw])
+
+# column types for the draftkings csv
+DK_DTYPES = {'Position': 'category', 'Salary': 'int32', 'AvgPointsPerGame': 'float32',
+             'TeamAbbrev': 'category'}
+
+# empty set of row positions, for pools with nobody in them
+no_players = np.array([], dtype=np.intp)
+
+# one generator for every lineup drawn in this process
+rng = np.random.default_rng()
+
+
+@functools.lru_cache(maxsize=1)
+def get_combo():
+    # scraping and merging only happen the first time this is called, later calls reuse the frames
+    stats = get_stats()
+
+    # csv data as pandas df, typed up front (positions as categories so the DST checks compare
+    # int codes, salaries in int32 and points per game in float32, same width as the scraped stats)
+    dk = pd.read_csv(dk_csv_path, dtype=DK_DTYPES, engine='pyarrow')
+
+    # replacing unwanted chars found in player names
+    dk['Name'] = clean_names(dk['Name'])
+
+    #  getting rid of players from draftking dk
+    dk_def = dk[dk['Position'] == 'DST']
+
+    #  getting rid of defense from draft kings df
+    dk_players = dk[dk['Position'] != 'DST']
+
+    # combining draftkings and stats dfs, inner join drops players who aren't playing
+    combo = stats.merge(dk_players, on='Name', how='inner')
+    combo['FantPos'] = combo['FantPos'].astype('category')
+    return combo, dk_def
+
+
+@functools.lru_cache(maxsize=1)
+def get_pools():
+    # position pools are filtered once per process and shared by every lineup drawn from them
+    combo, dk_def = get_combo()
+
+    # finding positions (one pass over FantPos, then a row gather per position)
+    positions = combo.groupby('FantPos', sort=False, observed=True).indices
+    qb_raw = combo.iloc[positions.get('QB', no_players)]
+    wr_raw = combo.iloc[positions.get('WR', no_players)]
+    rb_raw = combo.iloc[positions.get('RB', no_players)]
+    te_raw = combo.iloc[positions.get('TE', no_players)]
+    flex_raw = combo.iloc[np.concatenate(
+        [positions.get(pos, no_players) for pos in ('RB', 'WR', 'TE')])]
+
+    # the wr, rb and te filters go through DataFrame.query, which hands the whole predicate to
+    # numexpr so the comparisons run fused instead of building a temp boolean array per condition
+
+    # finding wr by targets
+    wr_targets = np.nanpercentile(wr_raw['Tgt'].to_numpy(), 75)
+
+    wr = wr_raw.query('Tgt >= @wr_targets and VBD > 2')
+
+    # finding rb by rushing attempts
+    rb_attempts = np.nanpercentile(rb_raw['Att'].to_numpy(), 75)
+
+    rb = rb_raw.query('Att >= @rb_attempts and VBD > 1.5')
+
+    # finding qb by Pass_cmp/Pass_Att and Pass_Yds/Pass_Att (pass yards per attempt),
+    # thresholds are multiplied by Pass_Att instead of dividing by it, same test without the divides
+    pass_cmp = qb_raw['Pass_Cmp'].to_numpy()
+    pass_att = qb_raw['Pass_Att'].to_numpy()
+    pass_yds = qb_raw['Pass_Yds'].to_numpy()
+    qb = qb_raw[(pass_cmp > .6 * pass_att) & (pass_yds > 5 * pass_att) & (
+        qb_raw['VBD'].to_numpy() > 2)]  # bitwise AND
+
+    # finding te by targets (same wr target cutoff as above, no need to recompute it)
+    te_targets = wr_targets
+
+    te = te_raw.query('Tgt >= @te_targets and VBD > 2')
+
+    # finding flex by combination (nanpercentile selects with np.partition, no full sort)
+    tgts = flex_raw['Tgt'].to_numpy()
+    atts = flex_raw['Att'].to_numpy()
+    vbd = flex_raw['VBD'].to_numpy()
+    flex_targets, flex_attempts = np.nanpercentile(np.column_stack([tgts, atts]), 75, axis=0)
+    flex = flex_raw[ne.evaluate('((tgts >= flex_targets) | (atts >= flex_attempts)) & (vbd > 2)',
+                                local_dict={'tgts': tgts, 'atts': atts, 'vbd': vbd,
+                                            'flex_targets': flex_targets, 'flex_attempts': flex_attempts})]
+
+    # finding defense by average fantasy points
+    d_arg = np.nanpercentile(dk_def['AvgPointsPerGame'].to_numpy(), 25)
+    defense = dk_def[dk_def['AvgPointsPerGame'] >= d_arg]
+    return qb, rb, wr, te, flex, defense
+
+
+def check_pools(qb, rb, wr, te, flex, defense):
+    # every slot needs enough players left in its filtered pool
+    for pos, pool, needed in (('qb', qb, 1), ('rb', rb, 2), ('wr', wr, 3), ('te', te, 1), ('defense', defense, 1)):
+        if len(pool) < needed:
+            raise ValueError(f'a lineup needs {needed} {pos} but the filtered pool only has {len(pool)}')
+
+    # a pool with exactly as many players as slots puts all of them in every lineup,
+    # so the flex needs at least one player outside those
+    forced = [pool.index.to_numpy() for pool, needed in ((rb, 2), (wr, 3), (te, 1)) if len(pool) == needed]
+    if not len(np.setdiff1d(flex.index.to_numpy(), np.concatenate([no_players] + forced))):
+        raise ValueError('no flex player left in the filtered pool after the rb, wr and te picks')
+
+
+def make_team():
+    combo, _ = get_combo()
+    qb, rb, wr, te, flex, defense = get_pools()
+    check_pools(qb, rb, wr, te, flex, defense)
+
+    # getting team picks as row positions into combo, pools keep combo's default index so their
+    # labels are those positions (rbs and wrs are drawn without replacement so nobody is picked twice)
+    picks = np.concatenate([rng.choice(qb.index.to_numpy(), size=1),
+                            rng.choice(rb.index.to_numpy(), size=2, replace=False),
+                            rng.choice(wr.index.to_numpy(), size=3, replace=False),
+                            rng.choice(te.index.to_numpy(), size=1)])
+
+    # the flex can't be anybody already in the lineup
+    flex_left = np.setdiff1d(flex.index.to_numpy(), picks)
+    if not len(flex_left):
+        raise ValueError('no flex player left in the filtered pool after the rb, wr and te picks')
+    picks = np.append(picks, rng.choice(flex_left, size=1))
+    defenserng = rng.integers(len(defense))
+
+    # making the team, one gather for the players and one for the defense
+    return pd.concat([combo.take(picks), defense.take([defenserng])], ignore_index=True)
@@ -0,0 +1,5 @@
+#! python
+# http_session.py - one keep-alive session for the scrapers instead of a fresh connection per request
+import requests
+
+SESSION = requests.Session()
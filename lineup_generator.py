@@ -1,41 +1,41 @@
 #! python
 # combo_lineup.py - uses combined dataframes to generate draftkings lineup
-from combiner import combo, dk_def
+from combiner import check_pools, get_combo, get_pools, make_team
+from lineup_sim import gen_lineups
+from optimizer import SALARY_CAP, generate_optimal
+import functools
 import os
 import sys
-import random
-import pandas as pd
-
-# finding positions
-qb_raw = combo[combo['FantPos'] == 'QB']
-wr_raw = combo[combo['FantPos'] == 'WR']
-rb_raw = combo[combo['FantPos'] == 'RB']
-te_raw = combo[combo['FantPos'] == 'TE']
-flex_raw = combo[(combo['FantPos'] == 'RB') | (
-    combo['FantPos'] == 'WR') | (combo['FantPos'] == 'TE')]
-
-# getting team ranges
-qbrng = random.randint(0, len(qb_raw)-1)
-rbrng = random.randint(0, len(rb_raw)-1)
-rbrng2 = random.randint(0, len(rb_raw)-1)
-wrrng = random.randint(0, len(wr_raw)-1)
-wrrng2 = random.randint(0, len(wr_raw)-1)
-wrrng3 = random.randint(0, len(wr_raw)-1)
-terng = random.randint(0, len(te_raw)-1)
-flexrng = random.randint(0, len(flex_raw)-1)
-defenserng = random.randint(0, len(dk_def)-1)
-
-# shuffling repeat positions to avoid duplicates, using pd.sample
-rb1_raw = rb_raw.sample(frac=1)
-rb2_raw = rb_raw.sample(frac=1)
-wr1_raw = wr_raw.sample(frac=1)
-wr2_raw = wr_raw.sample(frac=1)
-wr3_raw = wr_raw.sample(frac=1)
-
-# making the team
-team_raw = [qb_raw.iloc[qbrng], rb1_raw.iloc[rbrng], rb2_raw.iloc[rbrng2], wr1_raw.iloc[wrrng],
-            wr2_raw.iloc[wrrng2], wr3_raw.iloc[wrrng3], te_raw.iloc[terng], flex_raw.iloc[flexrng], dk_def.iloc[defenserng]]
-lineup = pd.DataFrame.from_records([x.to_dict() for x in team_raw])
+import numpy as np
+
+
+@functools.lru_cache(maxsize=1)
+def get_pool_ids():
+    # row positions into combo for each of combiner's position pools (their labels are combo's positions)
+    qb, rb, wr, te, flex, _ = get_pools()
+    return tuple(pool.index.to_numpy(dtype=np.int32) for pool in (qb, rb, wr, te, flex))
+
+
+def generate():
+    # a random lineup drawn from combiner's filtered position pools
+    return make_team()
+
+
+def simulate_lineups(n, salary_cap=SALARY_CAP):
+    # n random lineups under the cap in one numba call, each row is qb, rb, rb, wr, wr, wr, te, flex
+    # as row positions into combo and the defense as a row position into combiner's defense pool
+    # (-1 if no fit was found)
+    combo, _ = get_combo()
+    pools = get_pools()
+    check_pools(*pools)
+    defense = pools[-1]
+    return gen_lineups(*get_pool_ids(), combo['Salary'].to_numpy(dtype=np.int32),
+                       defense['Salary'].to_numpy(dtype=np.int32), salary_cap, n)
+
 
 def print_lineup():
-    print(lineup)
+    print(generate())
+
+
+def print_optimal_lineup():
+    print(generate_optimal(*get_combo()))
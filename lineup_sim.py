@@ -0,0 +1,48 @@
+#! python
+# lineup_sim.py - numba kernel that draws lots of salary-capped lineups at once
+import numba
+import numpy as np
+
+# random draws per lineup before giving up on finding one under the cap
+MAX_TRIES = 1000
+
+
+@numba.njit(parallel=True, cache=True)
+def gen_lineups(qb_ids, rb_ids, wr_ids, te_ids, flex_ids, salaries, def_salaries, salary_cap, n):
+    # player ids are row positions into the player table (salaries), defenses are drawn straight
+    # from the rows of the defense table (def_salaries), rows that never fit under the cap are left as -1
+    out = np.full((n, 9), -1, dtype=np.int32)
+    for i in numba.prange(n):
+        for _ in range(MAX_TRIES):
+            qb = qb_ids[np.random.randint(0, qb_ids.size)]
+            rb1 = rb_ids[np.random.randint(0, rb_ids.size)]
+            rb2 = rb_ids[np.random.randint(0, rb_ids.size)]
+            wr1 = wr_ids[np.random.randint(0, wr_ids.size)]
+            wr2 = wr_ids[np.random.randint(0, wr_ids.size)]
+            wr3 = wr_ids[np.random.randint(0, wr_ids.size)]
+            te = te_ids[np.random.randint(0, te_ids.size)]
+            flex = flex_ids[np.random.randint(0, flex_ids.size)]
+            dst = np.random.randint(0, def_salaries.size)
+
+            # nobody can be in the lineup twice
+            if rb1 == rb2 or wr1 == wr2 or wr1 == wr3 or wr2 == wr3:
+                continue
+            if flex == rb1 or flex == rb2 or flex == wr1 or flex == wr2 or flex == wr3 or flex == te:
+                continue
+
+            salary = (salaries[qb] + salaries[rb1] + salaries[rb2] + salaries[wr1] + salaries[wr2]
+                      + salaries[wr3] + salaries[te] + salaries[flex] + def_salaries[dst])
+            if salary > salary_cap:
+                continue
+
+            out[i, 0] = qb
+            out[i, 1] = rb1
+            out[i, 2] = rb2
+            out[i, 3] = wr1
+            out[i, 4] = wr2
+            out[i, 5] = wr3
+            out[i, 6] = te
+            out[i, 7] = flex
+            out[i, 8] = dst
+            break
+    return out
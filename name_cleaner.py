@@ -0,0 +1,23 @@
+#! python
+# name_cleaner.py - strips unwanted chars from player names so scraped and draftkings names match
+
+# unwanted chars found in player names (order matters, ' Jr.' has to go before '.')
+NAME_JUNK = (" II", " V ", " Jr.", "\'", ".", "*")
+
+# delimiter that never shows up in a player name
+SEP = "\x00"
+
+
+def clean_names(names):
+    # missing names are left out of the join and stay missing, with none left there's nothing to clean
+    present = names.notna()
+    cleaned = names.copy()
+    if not present.any():
+        return cleaned
+
+    # joining the column into one big string so each replace is a single C-level pass
+    big = SEP.join(names[present].tolist())
+    for junk in NAME_JUNK:
+        big = big.replace(junk, "")
+    cleaned[present] = big.split(SEP)
+    return cleaned
@@ -0,0 +1,54 @@
+#! python
+# optimizer.py - solves for the highest projected draftkings lineup under the salary cap (integer program)
+import pulp
+import pandas as pd
+
+# draftkings salary cap for a classic lineup
+SALARY_CAP = 50000
+
+# (min, max) players per position, the max counts the flex spot
+POSITION_LIMITS = {'QB': (1, 1), 'RB': (2, 3), 'WR': (3, 4), 'TE': (1, 2)}
+
+# rbs + wrs + tes in a lineup (2 rb, 3 wr, 1 te and the flex)
+FLEX_TOTAL = 7
+
+
+def generate_optimal_lineups(combo, dk_def, salary_cap=SALARY_CAP, n_lineups=1, max_overlap=7):
+    # projections are draftkings' average points per game
+    players = combo[combo['FantPos'].isin(list(POSITION_LIMITS))]
+    x = pulp.LpVariable.dicts('p', players.index, cat='Binary')
+    d = pulp.LpVariable.dicts('d', dk_def.index, cat='Binary')
+
+    prob = pulp.LpProblem('dk', pulp.LpMaximize)
+    prob += (pulp.lpSum(players.at[i, 'AvgPointsPerGame'] * x[i] for i in players.index)
+             + pulp.lpSum(dk_def.at[j, 'AvgPointsPerGame'] * d[j] for j in dk_def.index))
+    prob += (pulp.lpSum(players.at[i, 'Salary'] * x[i] for i in players.index)
+             + pulp.lpSum(dk_def.at[j, 'Salary'] * d[j] for j in dk_def.index)) <= salary_cap
+
+    # filling every position, the flex is whichever rb/wr/te goes over its minimum
+    for pos, (least, most) in POSITION_LIMITS.items():
+        in_pos = pulp.lpSum(x[i] for i in players.index[players['FantPos'] == pos])
+        prob += in_pos >= least
+        prob += in_pos <= most
+    prob += pulp.lpSum(x[i] for i in players.index[players['FantPos'] != 'QB']) == FLEX_TOTAL
+    prob += pulp.lpSum(d.values()) == 1
+
+    lineups = []
+    for _ in range(n_lineups):
+        prob.solve(pulp.PULP_CBC_CMD(msg=0))
+        if pulp.LpStatus[prob.status] != 'Optimal':
+            break
+        picked = [i for i in players.index if x[i].value() > .5]
+        picked_def = [j for j in dk_def.index if d[j].value() > .5]
+        lineups.append(pd.concat([players.loc[picked], dk_def.loc[picked_def]]).reset_index(drop=True))
+
+        # the next lineup can share at most max_overlap of these 9 players
+        prob += pulp.lpSum(x[i] for i in picked) + pulp.lpSum(d[j] for j in picked_def) <= max_overlap
+    return lineups
+
+
+def generate_optimal(combo, dk_def, salary_cap=SALARY_CAP):
+    lineups = generate_optimal_lineups(combo, dk_def, salary_cap)
+    if not lineups:
+        raise ValueError(f'no lineup fits under the {salary_cap} salary cap')
+    return lineups[0]
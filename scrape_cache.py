@@ -0,0 +1,22 @@
+#! python
+# scrape_cache.py - keeps scraped dataframes on disk so repeat runs on the same day skip the download
+import datetime
+import hashlib
+import pathlib
+import pandas as pd
+
+# folder the pickled dataframes go in
+CACHE_DIR = pathlib.Path('.cache')
+
+
+def cached_scrape(url, scrape):
+    # one pickle per url per day, so stats still refresh daily
+    key = hashlib.md5(url.encode()).hexdigest()
+    cache = CACHE_DIR / f'{key}_{datetime.date.today()}.pkl'
+    if cache.exists():
+        return pd.read_pickle(cache)
+
+    df = scrape(url)
+    CACHE_DIR.mkdir(exist_ok=True)
+    df.to_pickle(cache)
+    return df
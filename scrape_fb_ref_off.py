@@ -1,10 +1,13 @@
 #! python
 # scrape_fb_ref_off.py - scrapes pro-football reference and turns into a pandas dataframe
-import requests
-import bs4
+import functools
+import io
 import pandas as pd
 import os
 from dotenv import load_dotenv
+from http_session import SESSION
+from scrape_cache import cached_scrape
+from name_cleaner import clean_names
 
 # loading our environment variables
 load_dotenv()
@@ -12,56 +15,57 @@ load_dotenv()
 # pandas option so that the df displays all columns
 pd.set_option('display.max_columns', None)
 
+# the only non-numeric columns (player name, team and position), they lead the table
+TEXT_COLS = ['Name', 'Tm', 'FantPos']
+
 # url we're scraping
 url_data = os.getenv("offense_url")
 
-res = requests.get(url_data)
-res.raise_for_status()  # raises exception if an issue with getting the url_data
 
-# making soup
-soup = bs4.BeautifulSoup(res.text, "html.parser")
+def scrape(url):
+    res = SESSION.get(url)
+    res.raise_for_status()  # raises exception if an issue with getting the url_data
 
-# getting column headers for our data
-column_headers = [th.getText() for th in
-                  soup.findAll('tr', limit=2)[1].findAll('th')]  # limit is optional arg
+    # parsing the stats table straight into a dataframe (lxml parses it in C, no per-cell python loop)
+    df_raw = pd.read_html(io.StringIO(res.text), flavor='lxml')[0]
 
-# getting data_rows (neccesary for getting player data)
-data_rows = soup.findAll('tr')[2:]
+    # getting column headers for our data (the table has a two row header, names are on the second)
+    column_headers = list(df_raw.columns.get_level_values(-1))
 
-# delete the 'rank row' to get rid of the assertion error
-column_headers.remove(column_headers[0])
+    # the header rows repeat inside the table, so we'll only keep rows with a rank
+    df_raw = df_raw[pd.to_numeric(df_raw.iloc[:, 0], errors='coerce').notnull()]
 
-# renaming column headers because there are duplicates between passing and rushing labels
-column_headers[6:10] = ['Pass_Cmp', 'Pass_Att', 'Pass_Yds', 'Pass_TD']
+    # delete the 'rank' column, we only needed it to find the data rows
+    df_raw = df_raw.iloc[:, 1:].copy()
+    column_headers.remove(column_headers[0])
 
-# getting player data(since it's coming from a matrix, you need to make a 2d list)
-player_data = [[td.getText() for td in data_rows[i].findAll('td')]
-               for i in range(len(data_rows))]
+    # renaming column headers because there are duplicates between passing and rushing labels
+    column_headers[6:10] = ['Pass_Cmp', 'Pass_Att', 'Pass_Yds', 'Pass_TD']
 
-# building our data frame
-df_raw = pd.DataFrame(player_data, columns=column_headers)
+    # adding a column label for our 'Name' column
+    column_headers[0] = 'Name'
 
-# there are some blank columns with 'none' in them, so we'll get rid of them with notnull
-df_raw = df_raw[df_raw.Tm.notnull()]
+    # renaming column header for easier searching (before the numbering below, so a rename can't clash)
+    renames = {'Y/R': 'YPR', 'Y/A': 'YPA'}
+    column_headers = [renames.get(col, col) for col in column_headers]
 
-# adding a column label for our 'Name' column
-df_raw.columns.values[0] = 'Name'
+    # numbering the leftover duplicate headers (Yds, Yds.1, ...) like read_csv does, so every column has its own label
+    dup_count = pd.Series(column_headers).groupby(column_headers).cumcount()
+    df_raw.columns = [f'{col}.{n}' if n else col for col, n in zip(column_headers, dup_count)]
 
-# renaming column header for easier searching
-df_raw = df_raw.rename(columns={'Y/R': 'YPR', 'Y/A': 'YPA'})
+    # replacing unwanted chars found in player names
+    df_raw['Name'] = clean_names(df_raw['Name'])
 
-# replacing unwanted chars found in player names
-df_raw['Name'] = df_raw['Name'].str.replace("\'", "")
-df_raw['Name'] = df_raw['Name'].str.replace(" II", "")
-df_raw['Name'] = df_raw['Name'].str.replace(" Jr.", "")
-df_raw['Name'] = df_raw['Name'].str.replace(".", "")
-df_raw['Name'] = df_raw['Name'].str.replace('*', "")
+    # converting every stat column to (float32) nums in one block, text columns stay as they are
+    is_num = ~df_raw.columns.isin(TEXT_COLS)
+    nums = df_raw.loc[:, is_num].apply(pd.to_numeric, errors='coerce', downcast='float')
+    df_raw = pd.concat([df_raw.loc[:, ~is_num], nums], axis=1)
 
-# converting object to nums
-df_raw = df_raw.apply(pd.to_numeric, errors='ignore')
+    # filling in NaN values in the table with '0'
+    return df_raw.fillna(0)
 
-# filling in NaN values in the table with '0'
-df_raw = df_raw.fillna(0)
 
-# renaming our dataframe
-stats = df_raw
+@functools.lru_cache(maxsize=1)
+def get_stats():
+    # scraping (or loading today's cached copy of) the table, only once per process
+    return cached_scrape(url_data, scrape)